@@ -2,36 +2,45 @@
 Centralized configuration for SageMaker pipeline
 """
 import os
+from dataclasses import dataclass, field
 
+def _env(name, default=None, cast=str):
+    """Field factory that reads an environment variable once, at construction"""
+    def factory():
+        value = os.getenv(name, default)
+        return cast(value) if value is not None else None
+    return field(default_factory=factory)
+
+@dataclass(frozen=True)
 class Config:
     """Pipeline configuration"""
     
     # AWS Configuration
-    AWS_REGION = os.getenv('AWS_REGION', 'us-east-1')
-    S3_BUCKET = os.getenv('S3_BUCKET', 'your-sagemaker-bucket')
-    SAGEMAKER_ROLE_ARN = os.getenv('SAGEMAKER_ROLE_ARN')
+    AWS_REGION: str = _env('AWS_REGION', 'us-east-1')
+    S3_BUCKET: str = _env('S3_BUCKET', 'your-sagemaker-bucket')
+    SAGEMAKER_ROLE_ARN: str = _env('SAGEMAKER_ROLE_ARN')
     
     # Training Configuration
-    TRAINING_INSTANCE_TYPE = os.getenv('TRAINING_INSTANCE_TYPE', 'ml.m5.large')
-    TRAINING_INSTANCE_COUNT = 1
+    TRAINING_INSTANCE_TYPE: str = _env('TRAINING_INSTANCE_TYPE', 'ml.m5.large')
+    TRAINING_INSTANCE_COUNT: int = 1
     
     # Model Hyperparameters
-    N_ESTIMATORS = int(os.getenv('N_ESTIMATORS', 100))
-    MAX_DEPTH = int(os.getenv('MAX_DEPTH', 5))
-    RANDOM_STATE = 42
-    TEST_SIZE = 0.2
+    N_ESTIMATORS: int = _env('N_ESTIMATORS', 100, int)
+    MAX_DEPTH: int = _env('MAX_DEPTH', 5, int)
+    RANDOM_STATE: int = 42
+    TEST_SIZE: float = 0.2
     
     # Deployment Configuration
-    ENDPOINT_NAME = os.getenv('ENDPOINT_NAME', 'iris-endpoint')
-    ENDPOINT_INSTANCE_TYPE = os.getenv('ENDPOINT_INSTANCE_TYPE', 'ml.t2.medium')
-    ENDPOINT_INSTANCE_COUNT = 1
+    ENDPOINT_NAME: str = _env('ENDPOINT_NAME', 'iris-endpoint')
+    ENDPOINT_INSTANCE_TYPE: str = _env('ENDPOINT_INSTANCE_TYPE', 'ml.t2.medium')
+    ENDPOINT_INSTANCE_COUNT: int = 1
     
     # Model Quality Gate
-    ACCURACY_THRESHOLD = float(os.getenv('ACCURACY_THRESHOLD', 0.85))
+    ACCURACY_THRESHOLD: float = _env('ACCURACY_THRESHOLD', 0.85, float)
     
     # Framework Configuration
-    FRAMEWORK_VERSION = '1.2-1'
-    PYTHON_VERSION = 'py3'
+    FRAMEWORK_VERSION: str = '1.2-1'
+    PYTHON_VERSION: str = 'py3'
     
     # S3 Paths
     @property
@@ -42,34 +51,35 @@ class Config:
     def s3_code_path(self):
         return f's3://{self.S3_BUCKET}/code'
     
-    @classmethod
-    def validate(cls):
+    def validate(self):
         """Validate required configuration"""
-        if not cls.SAGEMAKER_ROLE_ARN:
+        if not self.SAGEMAKER_ROLE_ARN:
             raise ValueError("SAGEMAKER_ROLE_ARN environment variable is required")
         
-        if not cls.S3_BUCKET or cls.S3_BUCKET == 'your-sagemaker-bucket':
+        if not self.S3_BUCKET or self.S3_BUCKET == 'your-sagemaker-bucket':
             raise ValueError("S3_BUCKET environment variable is required")
         
         print("✓ Configuration validated")
     
-    @classmethod
-    def display(cls):
+    def display(self):
         """Display current configuration"""
         print("\nCurrent Configuration:")
-        print(f"  AWS Region: {cls.AWS_REGION}")
-        print(f"  S3 Bucket: {cls.S3_BUCKET}")
-        print(f"  Training Instance: {cls.TRAINING_INSTANCE_TYPE}")
-        print(f"  Endpoint Instance: {cls.ENDPOINT_INSTANCE_TYPE}")
-        print(f"  Endpoint Name: {cls.ENDPOINT_NAME}")
-        print(f"  Accuracy Threshold: {cls.ACCURACY_THRESHOLD}")
-        print(f"  Model: RandomForest(n_estimators={cls.N_ESTIMATORS}, max_depth={cls.MAX_DEPTH})")
+        print(f"  AWS Region: {self.AWS_REGION}")
+        print(f"  S3 Bucket: {self.S3_BUCKET}")
+        print(f"  Training Instance: {self.TRAINING_INSTANCE_TYPE}")
+        print(f"  Endpoint Instance: {self.ENDPOINT_INSTANCE_TYPE}")
+        print(f"  Endpoint Name: {self.ENDPOINT_NAME}")
+        print(f"  Accuracy Threshold: {self.ACCURACY_THRESHOLD}")
+        print(f"  Model: RandomForest(n_estimators={self.N_ESTIMATORS}, max_depth={self.MAX_DEPTH})")
         print()
 
+# Environment is read once, when the module is first imported
+CONFIG = Config()
+
 if __name__ == '__main__':
     # Test configuration
     try:
-        Config.validate()
-        Config.display()
+        CONFIG.validate()
+        CONFIG.display()
     except ValueError as e:
         print(f"Configuration Error: {e}")
\ No newline at end of file
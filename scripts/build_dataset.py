@@ -0,0 +1,47 @@
+"""
+Build the prebuilt iris.npz consumed by src/train.py through the "train" channel
+"""
+import os
+import boto3
+import argparse
+import numpy as np
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--output', type=str, default='iris.npz', help='Local path to write the .npz to')
+    parser.add_argument('--s3-prefix', type=str, default=None,
+                        help='Optional s3://bucket/prefix to upload iris.npz to; pass it to trigger_training --train-data')
+    return parser.parse_args()
+
+def build_dataset(output_path):
+    """Write X (features), y (labels) and names (class names) as plain arrays"""
+    # Imported lazily: only needed when building the dataset
+    from sklearn.datasets import load_iris
+    iris = load_iris()
+    
+    # Unicode (not object) names so train.py can load with allow_pickle=False
+    np.savez(output_path, X=iris.data, y=iris.target, names=iris.target_names.astype(str))
+    print(f"✓ Dataset written to {output_path} ({len(iris.target)} samples)")
+
+def upload_dataset(output_path, s3_prefix):
+    """Upload the dataset as <s3_prefix>/iris.npz"""
+    bucket, _, prefix = s3_prefix[len('s3://'):].partition('/')
+    key = '/'.join(part for part in (prefix.strip('/'), 'iris.npz') if part)
+    
+    boto3.client('s3').upload_file(output_path, bucket, key)
+    print(f"✓ Uploaded to s3://{bucket}/{key}")
+
+def main():
+    args = parse_args()
+    
+    if args.s3_prefix and not args.s3_prefix.startswith('s3://'):
+        raise SystemExit(f"--s3-prefix must be an s3:// URI, got {args.s3_prefix}")
+    
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    build_dataset(args.output)
+    
+    if args.s3_prefix:
+        upload_dataset(args.output, args.s3_prefix)
+
+if __name__ == '__main__':
+    main()
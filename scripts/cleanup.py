@@ -3,7 +3,25 @@ Cleanup script to remove SageMaker resources and save costs
 """
 import boto3
 import argparse
+from botocore.config import Config
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from functools import lru_cache
+from itertools import takewhile
+
+# Adaptive retries back off on observed SageMaker throttling; the pool covers parallel deletes
+BOTO_CONFIG = Config(
+    retries={'max_attempts': 10, 'mode': 'adaptive'},
+    max_pool_connections=32,
+    tcp_keepalive=True
+)
+
+def positive_int(value):
+    """argparse type for options that must be at least 1"""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, got {value}")
+    return number
 
 def parse_args():
     parser = argparse.ArgumentParser(description='Cleanup SageMaker resources')
@@ -12,12 +30,35 @@ def parse_args():
     parser.add_argument('--delete-old-models', action='store_true', help='Delete models older than N days')
     parser.add_argument('--days', type=int, default=7, help='Days threshold for old models')
     parser.add_argument('--dry-run', action='store_true', help='Show what would be deleted without deleting')
-    parser.add_argument('--region', type=str, default='us-east-1')
-    return parser.parse_args()
+    parser.add_argument('--concurrency', type=positive_int, default=8, help='Max parallel delete requests')
+    parser.add_argument('--region', type=str, default=None,
+                        help='AWS region (default: boto3 lookup from environment/profile)')
+    parser.add_argument('--show-resources', action=argparse.BooleanOptionalAction, default=None,
+                        help='List iris resources before cleanup (default: only when no target is given)')
+    args = parser.parse_args()
+    
+    # Targeted deletes don't need the three list_* calls behind the initial snapshot
+    if args.show_resources is None:
+        args.show_resources = not (args.endpoint_name or args.delete_all_endpoints or args.delete_old_models)
+    return args
+
+@lru_cache(maxsize=None)
+def _sm(region=None):
+    """Return a SageMaker client, built once per region"""
+    return boto3.client('sagemaker', region_name=region, config=BOTO_CONFIG)
+
+def _iter_resources(client, operation, result_key, **kwargs):
+    """Yield items from a paginated list_* call, fetching pages only as they are consumed"""
+    for page in client.get_paginator(operation).paginate(**kwargs):
+        yield from page[result_key]
 
-def delete_endpoint(endpoint_name, dry_run=False):
+def _list_resources(client, operation, result_key, **kwargs):
+    """Collect every item of a paginated list_* call"""
+    return list(_iter_resources(client, operation, result_key, **kwargs))
+
+def delete_endpoint(endpoint_name, dry_run=False, region=None):
     """Delete a SageMaker endpoint"""
-    client = boto3.client('sagemaker')
+    client = _sm(region)
     
     try:
         # Get endpoint details
@@ -45,21 +86,19 @@ def delete_endpoint(endpoint_name, dry_run=False):
         else:
             print(f"Error deleting endpoint: {e}")
 
-def list_and_delete_iris_endpoints(dry_run=False):
+def list_and_delete_iris_endpoints(dry_run=False, concurrency=8, region=None):
     """List and delete all endpoints with 'iris' prefix"""
-    client = boto3.client('sagemaker')
+    client = _sm(region)
     
-    response = client.list_endpoints(
+    # Listed in full before any delete, so deletions can't shift later pages under the paginator
+    iris_endpoints = _list_resources(
+        client, 'list_endpoints', 'Endpoints',
+        NameContains='iris',
         SortBy='CreationTime',
         SortOrder='Descending',
-        MaxResults=100
+        PaginationConfig={'PageSize': 100}
     )
     
-    iris_endpoints = [
-        ep for ep in response['Endpoints']
-        if 'iris' in ep['EndpointName'].lower()
-    ]
-    
     if not iris_endpoints:
         print("No iris endpoints found")
         return
@@ -68,29 +107,39 @@ def list_and_delete_iris_endpoints(dry_run=False):
     for ep in iris_endpoints:
         print(f"  - {ep['EndpointName']} (Status: {ep['EndpointStatus']})")
     
-    if not dry_run:
-        for ep in iris_endpoints:
-            delete_endpoint(ep['EndpointName'], dry_run=False)
-    else:
+    if dry_run:
         print("\n[DRY RUN] Use --delete-all-endpoints without --dry-run to delete")
+        return
+    
+    # Deletes are IO-bound; bound the pool to stay under SageMaker API throttling limits
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [
+            executor.submit(delete_endpoint, ep['EndpointName'], dry_run=False, region=region)
+            for ep in iris_endpoints
+        ]
+        for future in futures:
+            future.result()
 
-def delete_old_models(days_threshold, dry_run=False):
+def delete_old_models(days_threshold, dry_run=False, concurrency=8, region=None):
     """Delete models older than N days"""
-    client = boto3.client('sagemaker')
+    client = _sm(region)
+    
+    now = datetime.now()
+    cutoff_date = now - timedelta(days=days_threshold)
     
-    cutoff_date = datetime.now() - timedelta(days=days_threshold)
+    def is_old(model):
+        return model['CreationTime'].replace(tzinfo=None) < cutoff_date
     
-    response = client.list_models(
+    # Oldest first, so listing stops at the first model newer than the cutoff.
+    # Materialized before any delete, so deletions can't shift later pages under the paginator
+    models = _iter_resources(
+        client, 'list_models', 'Models',
+        NameContains='iris',
         SortBy='CreationTime',
-        SortOrder='Descending',
-        MaxResults=100
+        SortOrder='Ascending',
+        PaginationConfig={'PageSize': 100}
     )
-    
-    old_models = [
-        model for model in response['Models']
-        if model['CreationTime'].replace(tzinfo=None) < cutoff_date
-        and 'iris' in model['ModelName'].lower()
-    ]
+    old_models = list(takewhile(is_old, models))
     
     if not old_models:
         print(f"No iris models older than {days_threshold} days found")
@@ -98,52 +147,75 @@ def delete_old_models(days_threshold, dry_run=False):
     
     print(f"Found {len(old_models)} old iris models:")
     for model in old_models:
-        age = (datetime.now() - model['CreationTime'].replace(tzinfo=None)).days
+        age = (now - model['CreationTime'].replace(tzinfo=None)).days
         print(f"  - {model['ModelName']} ({age} days old)")
     
     if dry_run:
         print(f"\n[DRY RUN] Would delete {len(old_models)} models")
         return
     
-    for model in old_models:
+    def _delete_model(model):
         try:
             print(f"Deleting model: {model['ModelName']}")
             client.delete_model(ModelName=model['ModelName'])
             print(f"✓ Deleted {model['ModelName']}")
         except Exception as e:
             print(f"Error deleting {model['ModelName']}: {e}")
+    
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [executor.submit(_delete_model, model) for model in old_models]
+        for future in futures:
+            future.result()
 
-def show_current_resources():
+def show_current_resources(region=None):
     """Display current SageMaker resources"""
-    client = boto3.client('sagemaker')
+    client = _sm(region)
+    now = datetime.now()
     
     print("\n" + "="*60)
     print("Current SageMaker Resources")
     print("="*60)
     
+    # The three listings are independent, so fetch them concurrently
+    listing = dict(
+        NameContains='iris',
+        SortBy='CreationTime',
+        SortOrder='Descending'
+    )
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        endpoints_future = executor.submit(
+            _list_resources, client, 'list_endpoints', 'Endpoints',
+            PaginationConfig={'PageSize': 100}, **listing
+        )
+        models_future = executor.submit(
+            _list_resources, client, 'list_models', 'Models',
+            PaginationConfig={'PageSize': 100}, **listing
+        )
+        jobs_future = executor.submit(
+            _list_resources, client, 'list_training_jobs', 'TrainingJobSummaries',
+            PaginationConfig={'PageSize': 10, 'MaxItems': 10}, **listing
+        )
+    iris_endpoints = endpoints_future.result()
+    iris_models = models_future.result()
+    iris_jobs = jobs_future.result()
+    
     # Endpoints
-    endpoints = client.list_endpoints(MaxResults=100)
-    iris_endpoints = [ep for ep in endpoints['Endpoints'] if 'iris' in ep['EndpointName'].lower()]
     print(f"\nEndpoints: {len(iris_endpoints)}")
     for ep in iris_endpoints:
         print(f"  - {ep['EndpointName']} ({ep['EndpointStatus']})")
     
     # Models
-    models = client.list_models(MaxResults=100)
-    iris_models = [m for m in models['Models'] if 'iris' in m['ModelName'].lower()]
     print(f"\nModels: {len(iris_models)}")
     for model in iris_models[:5]:  # Show first 5
-        age = (datetime.now() - model['CreationTime'].replace(tzinfo=None)).days
+        age = (now - model['CreationTime'].replace(tzinfo=None)).days
         print(f"  - {model['ModelName']} ({age} days old)")
     if len(iris_models) > 5:
         print(f"  ... and {len(iris_models) - 5} more")
     
     # Training jobs
-    training_jobs = client.list_training_jobs(MaxResults=10, SortBy='CreationTime', SortOrder='Descending')
-    iris_jobs = [j for j in training_jobs['TrainingJobSummaries'] if 'iris' in j['TrainingJobName'].lower()]
     print(f"\nRecent Training Jobs: {len(iris_jobs)}")
     for job in iris_jobs[:5]:
-        age = (datetime.now() - job['CreationTime'].replace(tzinfo=None)).days
+        age = (now - job['CreationTime'].replace(tzinfo=None)).days
         print(f"  - {job['TrainingJobName']} ({job['TrainingJobStatus']}, {age} days ago)")
     
     print()
@@ -166,27 +238,28 @@ def main():
     if args.dry_run:
         print("\n🔍 DRY RUN MODE - No resources will be deleted\n")
     
-    # Show current resources
-    show_current_resources()
+    # Show current resources (the updated listing below is kept for real deletes)
+    if args.show_resources:
+        show_current_resources(region=args.region)
     
     # Delete specific endpoint
     if args.endpoint_name:
-        delete_endpoint(args.endpoint_name, dry_run=args.dry_run)
+        delete_endpoint(args.endpoint_name, dry_run=args.dry_run, region=args.region)
     
     # Delete all iris endpoints
     if args.delete_all_endpoints:
-        list_and_delete_iris_endpoints(dry_run=args.dry_run)
+        list_and_delete_iris_endpoints(dry_run=args.dry_run, concurrency=args.concurrency, region=args.region)
     
     # Delete old models
     if args.delete_old_models:
-        delete_old_models(args.days, dry_run=args.dry_run)
+        delete_old_models(args.days, dry_run=args.dry_run, concurrency=args.concurrency, region=args.region)
     
     # Show updated state
     if not args.dry_run and (args.endpoint_name or args.delete_all_endpoints or args.delete_old_models):
         print("\n" + "="*60)
         print("Updated Resources")
         print("="*60)
-        show_current_resources()
+        show_current_resources(region=args.region)
     
     if args.dry_run:
         print("\n💡 Run without --dry-run to actually delete resources")
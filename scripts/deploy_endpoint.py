@@ -2,13 +2,21 @@
 Deploy trained model to SageMaker endpoint
 """
 import os
-import json
 import time
 import boto3
+import orjson
 import argparse
 from datetime import datetime
-from sagemaker.sklearn import SKLearnModel
-from sagemaker import Session
+from functools import lru_cache
+from botocore.config import Config
+from botocore.exceptions import WaiterError
+
+# Adaptive retries back off on observed SageMaker throttling
+BOTO_CONFIG = Config(
+    retries={'max_attempts': 10, 'mode': 'adaptive'},
+    max_pool_connections=32,
+    tcp_keepalive=True
+)
 
 def parse_args():
     parser = argparse.ArgumentParser()
@@ -20,9 +28,24 @@ def parse_args():
     parser.add_argument('--update-endpoint', action='store_true', help='Update existing endpoint')
     return parser.parse_args()
 
+@lru_cache(maxsize=1)
+def _sm_session():
+    """Return a SageMaker session, built once per process"""
+    # Imported lazily: the sagemaker SDK takes seconds to import, which --help shouldn't pay
+    from sagemaker import Session
+    boto_session = boto3.Session()
+    return Session(
+        boto_session=boto_session,
+        sagemaker_client=boto_session.client('sagemaker', config=BOTO_CONFIG)
+    )
+
+def _sm():
+    """Return the shared session's SageMaker client"""
+    return _sm_session().sagemaker_client
+
 def check_endpoint_exists(endpoint_name):
     """Check if endpoint already exists"""
-    client = boto3.client('sagemaker')
+    client = _sm()
     
     try:
         response = client.describe_endpoint(EndpointName=endpoint_name)
@@ -32,8 +55,9 @@ def check_endpoint_exists(endpoint_name):
 
 def create_model(args):
     """Create SageMaker Model"""
+    from sagemaker.sklearn import SKLearnModel
     
-    session = Session()
+    session = _sm_session()
     timestamp = datetime.now().strftime('%Y-%m-%d-%H-%M-%S')
     model_name = f'iris-model-{timestamp}'
     
@@ -76,7 +100,7 @@ def update_existing_endpoint(model, args):
     timestamp = datetime.now().strftime('%Y-%m-%d-%H-%M-%S')
     endpoint_config_name = f'iris-endpoint-config-{timestamp}'
     
-    client = boto3.client('sagemaker')
+    client = _sm()
     
     # Create new endpoint config
     client.create_endpoint_config(
@@ -100,20 +124,32 @@ def update_existing_endpoint(model, args):
     
     print("Waiting for endpoint update to complete...")
     
-    # Wait for update to complete
+    # Wait for update to complete. The waiter also gives up on a timeout or an
+    # unexpected (e.g. transient) error, so only a Failed status aborts the deploy
+    waiter = client.get_waiter('endpoint_in_service')
     while True:
+        try:
+            waiter.wait(
+                EndpointName=args.endpoint_name,
+                WaiterConfig={'Delay': 30, 'MaxAttempts': 60}
+            )
+        except WaiterError as e:
+            print(f"Waiter stopped before a final status: {e}")
+        
         response = client.describe_endpoint(EndpointName=args.endpoint_name)
         status = response['EndpointStatus']
         print(f"Status: {status}")
         
         if status == 'InService':
-            print(f"Endpoint {args.endpoint_name} updated successfully!")
             break
         elif status == 'Failed':
             failure_reason = response.get('FailureReason', 'Unknown')
             raise Exception(f"Endpoint update failed: {failure_reason}")
         
+        print("Endpoint update still in progress, continuing to wait...")
         time.sleep(30)
+    
+    print(f"Endpoint {args.endpoint_name} updated successfully!")
 
 def save_endpoint_info(endpoint_name, instance_type):
     """Save endpoint info for testing"""
@@ -124,8 +160,8 @@ def save_endpoint_info(endpoint_name, instance_type):
         'timestamp': datetime.now().isoformat()
     }
     
-    with open('endpoint_info.json', 'w') as f:
-        json.dump(endpoint_info, f, indent=2)
+    with open('endpoint_info.json', 'wb') as f:
+        f.write(orjson.dumps(endpoint_info, option=orjson.OPT_INDENT_2))
     
     print("Endpoint info saved to endpoint_info.json")
 
@@ -1,10 +1,11 @@
 """
 Test SageMaker endpoint with sample predictions
 """
-import json
 import boto3
+import orjson
 import argparse
-from sklearn.datasets import load_iris
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 
 def parse_args():
     parser = argparse.ArgumentParser()
@@ -12,8 +13,11 @@ def parse_args():
     parser.add_argument('--region', type=str, default='us-east-1', help='AWS region')
     return parser.parse_args()
 
+@lru_cache(maxsize=1)
 def get_test_data():
-    """Get sample data from Iris dataset"""
+    """Get sample data from Iris dataset (loaded once; callers must not mutate it)"""
+    # Imported lazily so argument errors don't wait on scikit-learn's import
+    from sklearn.datasets import load_iris
     iris = load_iris()
     
     # Get one sample from each class
@@ -34,18 +38,23 @@ def get_test_data():
     
     return test_samples
 
+@lru_cache(maxsize=None)
+def _runtime(region):
+    """Return a SageMaker runtime client, built once per region"""
+    return boto3.client('sagemaker-runtime', region_name=region)
+
 def invoke_endpoint(endpoint_name, payload, region):
     """Invoke SageMaker endpoint"""
     
-    runtime = boto3.client('sagemaker-runtime', region_name=region)
+    runtime = _runtime(region)
     
     response = runtime.invoke_endpoint(
         EndpointName=endpoint_name,
         ContentType='application/json',
-        Body=json.dumps(payload)
+        Body=orjson.dumps(payload)
     )
     
-    result = json.loads(response['Body'].read().decode())
+    result = orjson.loads(response['Body'].read())
     return result
 
 def test_single_prediction(endpoint_name, region):
@@ -55,7 +64,9 @@ def test_single_prediction(endpoint_name, region):
     print("Testing Single Prediction")
     print("="*50)
     
-    test_samples = get_test_data()
+    # Every sample is already covered by the batch test in a single request, so
+    # only one round-trip is spent here to exercise the 'features' code path
+    test_samples = get_test_data()[:1]
     
     passed = 0
     failed = 0
@@ -72,7 +83,7 @@ def test_single_prediction(endpoint_name, region):
             result = invoke_endpoint(endpoint_name, payload, region)
             prediction = result['prediction']
             print(f"Predicted: {prediction}")
-            print(f"Probabilities: {json.dumps(result['probabilities'], indent=2)}")
+            print(f"Probabilities: {orjson.dumps(result['probabilities'], option=orjson.OPT_INDENT_2).decode()}")
             
             if prediction == sample['expected']:
                 print("✓ PASSED")
@@ -140,10 +151,17 @@ def test_error_handling(endpoint_name, region):
         {'features': 'not a list'},  # Wrong type
     ]
     
-    for i, payload in enumerate(invalid_payloads):
+    # The requests are independent, so send them concurrently and report in order
+    with ThreadPoolExecutor(max_workers=len(invalid_payloads)) as executor:
+        futures = [
+            executor.submit(invoke_endpoint, endpoint_name, payload, region)
+            for payload in invalid_payloads
+        ]
+    
+    for i, (payload, future) in enumerate(zip(invalid_payloads, futures)):
         print(f"\nTest {i+1}: {payload}")
         try:
-            result = invoke_endpoint(endpoint_name, payload, region)
+            future.result()
             print("✗ FAILED: Expected error but got result")
         except Exception as e:
             print(f"✓ PASSED: Got expected error - {str(e)[:100]}")
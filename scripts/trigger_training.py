@@ -2,16 +2,31 @@
 Trigger SageMaker training job from CI/CD
 FINAL FIX: Extract metrics from output.tar.gz
 """
+import io
 import os
-import json
+import glob
+import gzip
+import hashlib
 import time
 import boto3
+import orjson
 import argparse
 import tarfile
-import tempfile
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from sagemaker.sklearn import SKLearn
-from sagemaker import get_execution_role, Session
+from functools import lru_cache
+from itertools import islice
+from botocore.config import Config
+from botocore.exceptions import ClientError, WaiterError
+
+# Adaptive retries back off on observed throttling (S3 SlowDown, SageMaker ThrottlingException)
+BOTO_CONFIG = Config(
+    retries={'max_attempts': 10, 'mode': 'adaptive'},
+    max_pool_connections=32,
+    tcp_keepalive=True
+)
 
 def parse_args():
     parser = argparse.ArgumentParser()
@@ -20,14 +35,62 @@ def parse_args():
     parser.add_argument('--instance-type', type=str, default='ml.m5.large')
     parser.add_argument('--n-estimators', type=int, default=100)
     parser.add_argument('--max-depth', type=int, default=5)
+    parser.add_argument('--n-jobs', type=int, default=-1, help='Cores used to fit trees (-1 = all)')
+    parser.add_argument('--train-data', type=str, default=None,
+                        help='S3 prefix holding iris.npz (arrays X, y, names; see scripts/build_dataset.py), '
+                             'mounted as the "train" channel in FastFile mode')
     parser.add_argument('--wait', action='store_true', help='Wait for training to complete')
     return parser.parse_args()
 
-def create_training_job(args):
-    """Create and start SageMaker training job"""
+@lru_cache(maxsize=1)
+def _sm_session():
+    """Return a SageMaker session, built once per process"""
+    # Imported lazily: the sagemaker SDK takes seconds to import, which --help shouldn't pay
+    from sagemaker import Session
+    boto_session = boto3.Session()
+    return Session(
+        boto_session=boto_session,
+        sagemaker_client=boto_session.client('sagemaker', config=BOTO_CONFIG)
+    )
+
+def stage_source_dir(bucket_name, source_dir='src'):
+    """Upload source_dir to S3 under its content hash, reusing an earlier upload if unchanged"""
+    files = sorted(
+        path for path in glob.glob(os.path.join(source_dir, '**'), recursive=True)
+        if os.path.isfile(path) and '__pycache__' not in path
+    )
     
-    # Initialize SageMaker session
-    session = Session()
+    digest = hashlib.sha256()
+    for path in files:
+        digest.update(os.path.relpath(path, source_dir).encode() + b'\0')
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    key = f'code/iris-{digest.hexdigest()[:12]}/sourcedir.tar.gz'
+    s3_uri = f's3://{bucket_name}/{key}'
+    
+    s3 = _s3()
+    try:
+        s3.head_object(Bucket=bucket_name, Key=key)
+        print(f"✓ Source unchanged, reusing {s3_uri}")
+        return s3_uri
+    except ClientError as e:
+        # Without s3:ListBucket a missing key is reported as 403; put_object below
+        # still surfaces a genuine access denial
+        if e.response['Error']['Code'] not in ('403', '404', 'NoSuchKey'):
+            raise
+    
+    # Same layout the SDK would build: files relative to source_dir at the archive root
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode='w:gz') as tar:
+        for path in files:
+            tar.add(path, arcname=os.path.relpath(path, source_dir))
+    s3.put_object(Bucket=bucket_name, Key=key, Body=buffer.getvalue())
+    print(f"✓ Uploaded source to {s3_uri}")
+    return s3_uri
+
+def create_training_job(args, session):
+    """Create and start SageMaker training job"""
+    from sagemaker.sklearn import SKLearn
     
     # Timestamp for unique job name
     timestamp = datetime.now().strftime('%Y-%m-%d-%H-%M-%S')
@@ -35,21 +98,24 @@ def create_training_job(args):
     
     print(f"Creating training job: {job_name}")
     
+    # An s3:// source_dir is used as-is, so unchanged code skips the SDK's tar + upload
+    source_dir = stage_source_dir(args.bucket_name)
+    
     # Define estimator
     estimator = SKLearn(
         entry_point='train.py',
-        source_dir='src',  # Directory containing train.py
+        source_dir=source_dir,  # sourcedir.tar.gz containing train.py
         role=args.role_arn,
         instance_type=args.instance_type,
         instance_count=1,
         framework_version='1.2-1',  # sklearn version
         py_version='py3',
         output_path=f's3://{args.bucket_name}/model-artifacts',
-        code_location=f's3://{args.bucket_name}/code',
         base_job_name='iris-training',
         hyperparameters={
             'n-estimators': args.n_estimators,
             'max-depth': args.max_depth,
+            'n-jobs': args.n_jobs,
             'random-state': 42,
             'test-size': 0.2
         },
@@ -61,7 +127,12 @@ def create_training_job(args):
     )
     
     print("Starting training job...")
-    estimator.fit(wait=False, job_name=job_name)
+    inputs = None
+    if args.train_data:
+        from sagemaker.inputs import TrainingInput
+        # FastFile streams objects on first read, so training starts without a full copy to disk
+        inputs = {'train': TrainingInput(args.train_data, input_mode='FastFile')}
+    estimator.fit(inputs=inputs, wait=False, job_name=job_name)
     
     return job_name, estimator
 
@@ -72,21 +143,28 @@ def wait_for_training(job_name, session):
     
     print(f"Waiting for training job {job_name} to complete...")
     
+    # The waiter stops on Completed/Stopped and raises on Failed, on an unexpected
+    # (e.g. transient) error, or after 360 x 20s. Only a terminal status ends the wait,
+    # so a timeout or hiccup never reports a still-running job as failed
+    waiter = client.get_waiter('training_job_completed_or_stopped')
     while True:
         try:
-            response = client.describe_training_job(TrainingJobName=job_name)
-            status = response['TrainingJobStatus']
-            
-            print(f"Status: {status}")
-            
-            if status in ['Completed', 'Failed', 'Stopped']:
-                break
-            
-            time.sleep(30)
-        except Exception as e:
-            print(f"Error checking training status: {e}")
-            time.sleep(30)
-            continue
+            waiter.wait(
+                TrainingJobName=job_name,
+                WaiterConfig={'Delay': 20, 'MaxAttempts': 360}
+            )
+        except WaiterError as e:
+            print(f"Waiter stopped before a final status: {e}")
+        
+        response = client.describe_training_job(TrainingJobName=job_name)
+        status = response['TrainingJobStatus']
+        print(f"Status: {status}")
+        
+        if status not in ('InProgress', 'Stopping'):
+            break
+        
+        print("Training job still running, continuing to wait...")
+        time.sleep(20)
     
     if status == 'Completed':
         print("Training completed successfully!")
@@ -99,10 +177,93 @@ def wait_for_training(job_name, session):
             print(f"Failure reason: {response['FailureReason']}")
         return False, None
 
+@lru_cache(maxsize=None)
+def _s3():
+    """Return an S3 client, built once per process"""
+    # Built from the SageMaker session's boto3 session so credentials and region are
+    # resolved once for the whole run
+    return _sm_session().boto_session.client('s3', config=BOTO_CONFIG)
+
+# Ranged-GET settings for reading large training archives
+TRANSFER_CHUNK_SIZE = 8 * 1024 * 1024
+TRANSFER_CONCURRENCY = 16
+TRANSFER_READ_SIZE = 1024 * 1024
+
+def request_range(s3, bucket, key, start):
+    """Issue a ranged GET for one chunk; the body is streamed only once it is read"""
+    return s3.get_object(
+        Bucket=bucket, Key=key,
+        Range=f'bytes={start}-{start + TRANSFER_CHUNK_SIZE - 1}'
+    )
+
+def iter_s3_object(s3, bucket, key, first=None):
+    """Yield an S3 object's bytes in order, fetching up to TRANSFER_CONCURRENCY ranges ahead
+    
+    first may be an already-issued request_range(..., 0) response
+    """
+    stop = threading.Event()
+    
+    def fetch(start):
+        # Read in small pieces so an abandoned range stops within TRANSFER_READ_SIZE bytes
+        body = request_range(s3, bucket, key, start)['Body']
+        parts = []
+        for part in body.iter_chunks(TRANSFER_READ_SIZE):
+            if stop.is_set():
+                body.close()
+                return None
+            parts.append(part)
+        return b''.join(parts)
+    
+    # The first range also reports the object size, so small objects cost a single GET
+    first = first or request_range(s3, bucket, key, 0)
+    yield first['Body'].read()
+    total = int(first['ContentRange'].rsplit('/', 1)[1])
+    
+    offsets = iter(range(TRANSFER_CHUNK_SIZE, total, TRANSFER_CHUNK_SIZE))
+    executor = ThreadPoolExecutor(max_workers=TRANSFER_CONCURRENCY)
+    try:
+        window = deque(executor.submit(fetch, o) for o in islice(offsets, TRANSFER_CONCURRENCY))
+        while window:
+            chunk = window.popleft().result()
+            for o in islice(offsets, 1):
+                window.append(executor.submit(fetch, o))
+            yield chunk
+    finally:
+        # Reader stopped early (e.g. metrics.json found): drop queued ranges and make
+        # in-flight ones abandon their bodies instead of downloading them in full
+        stop.set()
+        executor.shutdown(wait=True, cancel_futures=True)
+
+class ChunkReader(io.RawIOBase):
+    """Minimal read-only file object over an iterator of byte chunks"""
+    
+    def __init__(self, chunks):
+        self._chunks = chunks
+        self._buffer = memoryview(b'')
+    
+    def readable(self):
+        return True
+    
+    def readinto(self, b):
+        while not self._buffer:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return 0
+            self._buffer = memoryview(chunk)
+        n = min(len(b), len(self._buffer))
+        b[:n] = self._buffer[:n]
+        self._buffer = self._buffer[n:]
+        return n
+    
+    def close(self):
+        if hasattr(self._chunks, 'close'):
+            self._chunks.close()
+        super().close()
+
 def get_metrics_from_s3(model_artifacts_path, bucket_name):
     """Retrieve metrics from S3 - handle both direct and tarred files"""
     
-    s3 = boto3.client('s3')
+    s3 = _s3()
     
     # Extract key from S3 path
     # model_artifacts_path format: s3://bucket/path/to/output/model.tar.gz
@@ -117,48 +278,48 @@ def get_metrics_from_s3(model_artifacts_path, bucket_name):
         print(f"Bucket: {bucket}")
         print(f"Key prefix: {key_prefix}")
         
-        # Try 1: Look for metrics.json directly
         metrics_key = f"{key_prefix}/metrics.json"
+        output_tar_key = f"{key_prefix}/output.tar.gz"
+        
+        # Issue the direct lookup and the archive's first range together so a miss doesn't
+        # cost another round-trip. Only the archive's headers arrive until its body is read
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            metrics_future = executor.submit(s3.get_object, Bucket=bucket, Key=metrics_key)
+            tar_future = executor.submit(request_range, s3, bucket, output_tar_key, 0)
+        
+        # Try 1: Look for metrics.json directly
         print(f"Trying direct metrics at: s3://{bucket}/{metrics_key}")
         
         try:
-            response = s3.get_object(Bucket=bucket, Key=metrics_key)
-            metrics = json.loads(response['Body'].read().decode('utf-8'))
-            print(f"✓ Metrics retrieved successfully: {json.dumps(metrics, indent=2)}")
+            response = metrics_future.result()
+            metrics = orjson.loads(response['Body'].read())
+            print(f"✓ Metrics retrieved successfully: {orjson.dumps(metrics, option=orjson.OPT_INDENT_2).decode()}")
+            if not tar_future.exception():
+                tar_future.result()['Body'].close()
             return metrics
         except s3.exceptions.NoSuchKey:
             print(f"✗ Direct metrics file not found")
         
-        # Try 2: Download and extract output.tar.gz
-        output_tar_key = f"{key_prefix}/output.tar.gz"
+        # Try 2: Stream output.tar.gz and extract metrics.json on the fly
         print(f"Trying output.tar.gz at: s3://{bucket}/{output_tar_key}")
         
-        # Download output.tar.gz
-        with tempfile.NamedTemporaryFile(suffix='.tar.gz', delete=False) as tmp_file:
-            tmp_path = tmp_file.name
-            s3.download_file(bucket, output_tar_key, tmp_path)
-            print(f"✓ Downloaded output.tar.gz")
-        
-        # Extract and read metrics.json
-        with tarfile.open(tmp_path, 'r:gz') as tar:
-            # List contents
-            print(f"Contents of output.tar.gz: {tar.getnames()}")
-            
-            # Try to extract metrics.json
-            try:
-                metrics_file = tar.extractfile('metrics.json')
-                if metrics_file:
-                    metrics = json.loads(metrics_file.read().decode('utf-8'))
-                    print(f"✓ Metrics extracted from output.tar.gz: {json.dumps(metrics, indent=2)}")
-                    
-                    # Cleanup
-                    os.unlink(tmp_path)
+        # The archive is read as a forward-only stream, so decompression overlaps the
+        # parallel ranged download and nothing touches disk; members must be iterated,
+        # not looked up. GzipFile does the inflating so tarfile's 'r|' mode skips its
+        # own _Stream gzip layer and the extra buffering that comes with it
+        with ChunkReader(iter_s3_object(s3, bucket, output_tar_key, first=tar_future.result())) as body, \
+                gzip.GzipFile(fileobj=body) as gz, \
+                tarfile.open(fileobj=gz, mode='r|') as tar:
+            # Names are recorded during the single pass instead of a separate getnames() walk
+            seen = []
+            for member in tar:
+                seen.append(member.name)
+                if member.isfile() and os.path.basename(member.name) == 'metrics.json':
+                    metrics = orjson.loads(tar.extractfile(member).read())
+                    print(f"✓ Metrics extracted from output.tar.gz: {orjson.dumps(metrics, option=orjson.OPT_INDENT_2).decode()}")
                     return metrics
-            except KeyError:
-                print(f"✗ metrics.json not found in output.tar.gz")
         
-        # Cleanup
-        os.unlink(tmp_path)
+        print(f"✗ metrics.json not found in output.tar.gz (contents: {seen})")
         
         print("✗ Could not find metrics in any location")
         return {'accuracy': 0.0, 'note': 'Metrics file not found in S3 or output.tar.gz'}
@@ -180,21 +341,25 @@ def save_job_info(job_name, model_artifacts, metrics):
     }
     
     # Save to file for CI/CD to read
-    with open('training_job_info.json', 'w') as f:
-        json.dump(job_info, f, indent=2)
+    # Serialized once, for both the file and the log
+    contents = orjson.dumps(job_info, option=orjson.OPT_INDENT_2)
+    with open('training_job_info.json', 'wb') as f:
+        f.write(contents)
     
     print("Job info saved to training_job_info.json")
-    print(f"Contents: {json.dumps(job_info, indent=2)}")
+    print(f"Contents: {contents.decode()}")
 
 def main():
     args = parse_args()
     
+    # One session for both submitting and waiting on the job
+    session = _sm_session()
+    
     # Create and start training job
-    job_name, estimator = create_training_job(args)
+    job_name, estimator = create_training_job(args, session)
     
     # Wait for completion if requested
     if args.wait:
-        session = Session()
         success, model_artifacts = wait_for_training(job_name, session)
         
         if not success:
@@ -207,8 +372,8 @@ def main():
                 'status': 'failed',
                 'timestamp': datetime.now().isoformat()
             }
-            with open('training_job_info.json', 'w') as f:
-                json.dump(job_info, f, indent=2)
+            with open('training_job_info.json', 'wb') as f:
+                f.write(orjson.dumps(job_info, option=orjson.OPT_INDENT_2))
             exit(1)
         
         # Get metrics
@@ -233,8 +398,8 @@ def main():
             'status': 'started',
             'timestamp': datetime.now().isoformat()
         }
-        with open('training_job_info.json', 'w') as f:
-            json.dump(job_info, f, indent=2)
+        with open('training_job_info.json', 'wb') as f:
+            f.write(orjson.dumps(job_info, option=orjson.OPT_INDENT_2))
         exit(0)
 
 if __name__ == '__main__':
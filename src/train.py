@@ -7,10 +7,9 @@ import json
 import joblib
 import argparse
 import numpy as np
-from sklearn.datasets import load_iris
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestClassifier
-from sklearn.metrics import accuracy_score, classification_report
+from sklearn.metrics import accuracy_score, precision_recall_fscore_support
 
 def parse_args():
     parser = argparse.ArgumentParser()
@@ -20,15 +19,32 @@ def parse_args():
     parser.add_argument('--max-depth', type=int, default=5)
     parser.add_argument('--random-state', type=int, default=42)
     parser.add_argument('--test-size', type=float, default=0.2)
+    parser.add_argument('--n-jobs', type=int, default=-1, help='Cores used to fit trees (-1 = all)')
     
     # SageMaker specific paths
     parser.add_argument('--model-dir', type=str, default=os.environ.get('SM_MODEL_DIR', '/opt/ml/model'))
     parser.add_argument('--output-data-dir', type=str, default=os.environ.get('SM_OUTPUT_DATA_DIR', '/opt/ml/output'))
+    parser.add_argument('--data-path', type=str,
+                        default=os.path.join(os.environ.get('SM_CHANNEL_TRAIN', '/opt/ml/input/data'), 'iris.npz'),
+                        help='Prebuilt .npz with arrays X (features), y (labels) and names (class names), '
+                             'see scripts/build_dataset.py; load_iris() is used if missing and no train channel is set')
     
     return parser.parse_args()
 
-def load_data():
-    """Load and prepare Iris dataset"""
+def load_data(data_path=None):
+    """Load and prepare Iris dataset, preferring a prebuilt .npz at data_path"""
+    if data_path and os.path.exists(data_path):
+        print(f"Loading data from {data_path}")
+        with np.load(data_path, allow_pickle=False) as data:
+            return data['X'], data['y'], data['names']
+    
+    # A configured train channel without the dataset is a job setup error, not a fallback
+    if os.environ.get('SM_CHANNEL_TRAIN'):
+        raise FileNotFoundError(f"Train channel is set but {data_path} does not exist")
+    
+    print("No prebuilt dataset found, loading the bundled Iris dataset")
+    # Imported lazily: only needed when no prebuilt dataset is available
+    from sklearn.datasets import load_iris
     iris = load_iris()
     X = iris.data
     y = iris.target
@@ -39,22 +55,27 @@ def train_model(X_train, y_train, args):
     model = RandomForestClassifier(
         n_estimators=args.n_estimators,
         max_depth=args.max_depth,
-        random_state=args.random_state
+        random_state=args.random_state,
+        n_jobs=args.n_jobs,
+        max_features='sqrt',
+        bootstrap=True
     )
     model.fit(X_train, y_train)
     return model
 
-def evaluate_model(model, X_test, y_test, target_names):
+def evaluate_model(model, X_test, y_test):
     """Evaluate model and return metrics"""
     y_pred = model.predict(X_test)
     accuracy = accuracy_score(y_test, y_pred)
-    report = classification_report(y_test, y_pred, target_names=target_names, output_dict=True)
+    precision, recall, f1, _ = precision_recall_fscore_support(
+        y_test, y_pred, average='weighted', zero_division=0
+    )
     
     metrics = {
         'accuracy': float(accuracy),
-        'precision': float(report['weighted avg']['precision']),
-        'recall': float(report['weighted avg']['recall']),
-        'f1_score': float(report['weighted avg']['f1-score'])
+        'precision': float(precision),
+        'recall': float(recall),
+        'f1_score': float(f1)
     }
     return metrics
 
@@ -62,7 +83,9 @@ def save_model(model, model_dir):
     """Save model using joblib"""
     os.makedirs(model_dir, exist_ok=True)
     model_path = os.path.join(model_dir, 'model.joblib')
-    joblib.dump(model, model_path)
+    # Uncompressed so model_fn can memory-map the arrays instead of copying them.
+    # SageMaker already gzips model_dir into model.tar.gz for the S3 transfer
+    joblib.dump(model, model_path, compress=False, protocol=5)
     print(f"Model saved to {model_path}")
 
 def save_metrics(metrics, output_dir):
@@ -78,7 +101,7 @@ def main():
     args = parse_args()
     
     print("Loading data...")
-    X, y, target_names = load_data()
+    X, y, _ = load_data(args.data_path)
     
     print("Splitting data...")
     X_train, X_test, y_train, y_test = train_test_split(
@@ -89,7 +112,7 @@ def main():
     model = train_model(X_train, y_train, args)
     
     print("Evaluating model...")
-    metrics = evaluate_model(model, X_test, y_test, target_names)
+    metrics = evaluate_model(model, X_test, y_test)
     
     print("Saving model and metrics...")
     save_model(model, args.model_dir)